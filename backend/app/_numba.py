@@ -0,0 +1,19 @@
+"""Optional Numba acceleration with a graceful fallback.
+
+Import ``njit`` from here instead of from numba directly: when numba is
+installed the real JIT decorator is used, otherwise a no-op passthrough
+is returned so the decorated functions still run as plain Python.
+"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def wrapper(func):
+            return func
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return wrapper
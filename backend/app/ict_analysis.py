@@ -1,71 +1,127 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
+from _numba import njit
+
+@njit(cache=True)
+def _detect_sweeps(open_, high, low, close, volume, prior_high, prior_low,
+                   lookback, avg_volume):
+    """Scan candles for liquidity sweeps, compiled to native code via numba.
+
+    prior_high/prior_low hold the rolling window extremes ending on the
+    previous bar. Returns packed (types, prices, indices, count) arrays
+    where type is +1 for a bullish sweep and -1 for a bearish sweep.
+    """
+    n = high.shape[0]
+    types = np.empty(n, dtype=np.int8)
+    prices = np.empty(n, dtype=np.float64)
+    indices = np.empty(n, dtype=np.int64)
+    count = 0
+
+    for i in range(lookback, n - 1):
+        high_volume = volume[i] > 2 * avg_volume
+
+        # Bullish sweep
+        if high[i] > prior_high[i] and close[i + 1] < open_[i] and high_volume:
+            types[count] = 1
+            prices[count] = high[i]
+            indices[count] = i
+            count += 1
+
+        # Bearish sweep
+        if low[i] < prior_low[i] and close[i + 1] > open_[i] and high_volume:
+            types[count] = -1
+            prices[count] = low[i]
+            indices[count] = i
+            count += 1
+
+    return types, prices, indices, count
 
 class ICTAnalysis:
     def __init__(self, data: pd.DataFrame):
-        self.data = data
-        self.data['timestamp'] = pd.to_datetime(self.data['timestamp'])
-        self.data.set_index('timestamp', inplace=True)
-        self.data.sort_index(inplace=True)
-        
+        if isinstance(data.index, pd.DatetimeIndex):
+            # Already normalized; skip the datetime parse and only sort
+            # when the index is out of order
+            self.data = data if data.index.is_monotonic_increasing else data.sort_index()
+        else:
+            # Normalize on a copy so the caller's frame is left untouched
+            # and repeated construction over the same frame is idempotent
+            data = data.assign(timestamp=pd.to_datetime(data['timestamp']))
+            self.data = data.set_index('timestamp').sort_index()
+        # Per-instance memo cache; the data never mutates within a request,
+        # so repeated analysis calls can reuse earlier results
+        self._cache: Dict = {}
+
     def calculate_sma_slope(self, period: int = 20) -> float:
         """Calculate the slope of the 20-period SMA"""
+        key = ('sma_slope', period)
+        if key in self._cache:
+            return self._cache[key]
         sma = self.data['close'].rolling(window=period).mean()
-        if len(sma) < 2:
-            return 0
-        return (sma.iloc[-1] - sma.iloc[-2]) / sma.iloc[-2]
+        slope = 0 if len(sma) < 2 else (sma.iloc[-1] - sma.iloc[-2]) / sma.iloc[-2]
+        self._cache[key] = slope
+        return slope
 
     def get_quarterly_levels(self) -> Dict[str, float]:
         """Calculate quarterly levels based on the current year's data"""
+        if 'quarterly_levels' in self._cache:
+            return self._cache['quarterly_levels']
         current_year = datetime.now().year
-        year_start = datetime(current_year, 1, 1)
-        year_end = datetime(current_year, 12, 31)
-        
-        yearly_data = self.data[year_start:year_end]
-        
+        yearly_data = self.data[self.data.index.year == current_year]
+
         if len(yearly_data) == 0:
-            return {
+            levels = {
                 'q1_high': 0, 'q1_low': 0,
                 'q2_high': 0, 'q2_low': 0,
                 'q3_high': 0, 'q3_low': 0,
                 'q4_high': 0, 'q4_low': 0
             }
+            self._cache['quarterly_levels'] = levels
+            return levels
         
-        quarters = {
-            'q1': (datetime(current_year, 1, 1), datetime(current_year, 3, 31)),
-            'q2': (datetime(current_year, 4, 1), datetime(current_year, 6, 30)),
-            'q3': (datetime(current_year, 7, 1), datetime(current_year, 9, 30)),
-            'q4': (datetime(current_year, 10, 1), datetime(current_year, 12, 31))
-        }
-        
+        # One groupby pass over quarter numbers instead of four
+        # label-based datetime slices
+        grouped = yearly_data.groupby(yearly_data.index.quarter).agg(
+            high_max=('high', 'max'),
+            low_min=('low', 'min')
+        )
+
         levels = {}
-        for q, (start, end) in quarters.items():
-            quarter_data = yearly_data[start:end]
-            if len(quarter_data) > 0:
-                levels[f'{q}_high'] = quarter_data['high'].max()
-                levels[f'{q}_low'] = quarter_data['low'].min()
+        for q in range(1, 5):
+            if q in grouped.index:
+                levels[f'q{q}_high'] = grouped.at[q, 'high_max']
+                levels[f'q{q}_low'] = grouped.at[q, 'low_min']
             else:
-                levels[f'{q}_high'] = 0
-                levels[f'{q}_low'] = 0
-                
+                levels[f'q{q}_high'] = 0
+                levels[f'q{q}_low'] = 0
+
+        self._cache['quarterly_levels'] = levels
         return levels
 
     def determine_bias(self) -> str:
         """Determine market bias based on quarterly theory and SMA slope"""
+        if 'bias' in self._cache:
+            return self._cache['bias']
         levels = self.get_quarterly_levels()
         current_price = self.data['close'].iloc[-1]
         sma_slope = self.calculate_sma_slope()
         
         if current_price > levels['q2_high'] and sma_slope > 0:
-            return 'bullish'
+            bias = 'bullish'
         elif current_price < levels['q3_low'] and sma_slope < 0:
-            return 'bearish'
-        return 'neutral'
+            bias = 'bearish'
+        else:
+            bias = 'neutral'
+        self._cache['bias'] = bias
+        return bias
 
     def find_liquidity_pools(self, lookback: int = 20, threshold: float = 0.005) -> Dict[str, List[Dict]]:
         """Identify stop-loss clusters and PD arrays"""
+        key = ('liquidity_pools', lookback, threshold)
+        if key in self._cache:
+            return self._cache[key]
         recent_data = self.data.tail(lookback)
         
         # Find stop-loss clusters
@@ -74,32 +130,19 @@ class ICTAnalysis:
             'lows': []
         }
         
-        # Check for equal highs
-        for i in range(len(recent_data) - 2):
-            high1 = recent_data['high'].iloc[i]
-            count = 1
-            for j in range(i + 1, len(recent_data)):
-                if abs(recent_data['high'].iloc[j] - high1) / high1 <= threshold:
-                    count += 1
-            if count >= 3:
-                clusters['highs'].append({
-                    'price': high1,
-                    'count': count,
-                    'timestamp': recent_data.index[i]
-                })
-        
-        # Check for equal lows
-        for i in range(len(recent_data) - 2):
-            low1 = recent_data['low'].iloc[i]
-            count = 1
-            for j in range(i + 1, len(recent_data)):
-                if abs(recent_data['low'].iloc[j] - low1) / low1 <= threshold:
-                    count += 1
-            if count >= 3:
-                clusters['lows'].append({
-                    'price': low1,
-                    'count': count,
-                    'timestamp': recent_data.index[i]
+        # Check for equal highs and equal lows with a pairwise broadcast:
+        # one N x N relative-difference matrix replaces the nested Python loop
+        timestamps = recent_data.index
+        for side, column in (('highs', 'high'), ('lows', 'low')):
+            prices = recent_data[column].to_numpy(dtype=np.float64)
+            diff = np.abs(prices[None, :] - prices[:, None]) / prices[:, None]
+            # Count each candidate level plus the later candles within threshold
+            counts = 1 + np.triu(diff <= threshold, k=1).sum(axis=1)
+            for i in np.where(counts[:-2] >= 3)[0]:
+                clusters[side].append({
+                    'price': prices[i],
+                    'count': int(counts[i]),
+                    'timestamp': timestamps[i]
                 })
         
         # Calculate PD arrays
@@ -113,76 +156,108 @@ class ICTAnalysis:
             'discount': discount_level
         }
         
-        return {
+        pools = {
             'clusters': clusters,
             'pd_arrays': pd_arrays
         }
+        self._cache[key] = pools
+        return pools
+
+    def rolling_extremes(self, window: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """Rolling high/low over `window` bars ending on the previous bar.
+
+        Computed once per instance with pandas' O(N) rolling kernels and
+        shared by the sweep scan and the entry systems.
+        """
+        key = ('rolling_extremes', window)
+        if key not in self._cache:
+            self._cache[key] = (
+                self.data['high'].rolling(window).max().shift(1).to_numpy(dtype=np.float64),
+                self.data['low'].rolling(window).min().shift(1).to_numpy(dtype=np.float64)
+            )
+        return self._cache[key]
 
     def detect_liquidity_events(self, lookback: int = 20) -> Dict[str, List[Dict]]:
         """Detect liquidity sweeps and runs"""
         recent_data = self.data.tail(lookback + 3)  # Extra candles for sweep detection
-        avg_volume = recent_data['volume'].mean()
-        
+        # Materialize the columns once; every check below indexes plain arrays
+        open_, high, low, close, volume = (
+            recent_data[col].to_numpy(dtype=np.float64)
+            for col in ('open', 'high', 'low', 'close', 'volume')
+        )
+        avg_volume = volume.mean()
+
         events = {
             'sweeps': [],
             'runs': []
         }
-        
-        # Detect sweeps
-        for i in range(lookback, len(recent_data) - 1):
-            # Bullish sweep
-            if (recent_data['high'].iloc[i] > recent_data['high'].iloc[i-20:i].max() and
-                recent_data['close'].iloc[i+1] < recent_data['open'].iloc[i] and
-                recent_data['volume'].iloc[i] > 2 * avg_volume):
-                events['sweeps'].append({
-                    'type': 'bullish',
-                    'price': recent_data['high'].iloc[i],
-                    'timestamp': recent_data.index[i]
-                })
-            
-            # Bearish sweep
-            if (recent_data['low'].iloc[i] < recent_data['low'].iloc[i-20:i].min() and
-                recent_data['close'].iloc[i+1] > recent_data['open'].iloc[i] and
-                recent_data['volume'].iloc[i] > 2 * avg_volume):
-                events['sweeps'].append({
-                    'type': 'bearish',
-                    'price': recent_data['low'].iloc[i],
-                    'timestamp': recent_data.index[i]
-                })
+
+        # Detect sweeps via the compiled candle scan, reusing the
+        # precomputed rolling extremes for the prior-window checks
+        prior_high, prior_low = self.rolling_extremes(lookback)
+        sweep_types, sweep_prices, sweep_indices, sweep_count = _detect_sweeps(
+            open_, high, low, close, volume,
+            np.ascontiguousarray(prior_high[-len(recent_data):]),
+            np.ascontiguousarray(prior_low[-len(recent_data):]),
+            lookback, avg_volume
+        )
+        for k in range(sweep_count):
+            events['sweeps'].append({
+                'type': 'bullish' if sweep_types[k] == 1 else 'bearish',
+                'price': sweep_prices[k],
+                'timestamp': recent_data.index[sweep_indices[k]]
+            })
         
         # Detect runs
         liquidity_zones = self.find_liquidity_pools(lookback)['pd_arrays']
-        current_zone = None
-        
-        for i in range(lookback, len(recent_data) - 5):
-            price = recent_data['close'].iloc[i]
-            
-            # Determine current zone
-            if price >= liquidity_zones['premium']:
-                zone = 'premium'
-            elif price <= liquidity_zones['discount']:
-                zone = 'discount'
-            else:
-                zone = 'equilibrium'
-            
-            if zone != current_zone:
-                # Check if price sustains in new zone
-                if all(recent_data['close'].iloc[i:i+5] > liquidity_zones['premium'] if zone == 'premium'
-                      else recent_data['close'].iloc[i:i+5] < liquidity_zones['discount'] if zone == 'discount'
-                      else (recent_data['close'].iloc[i:i+5] < liquidity_zones['premium'] and
-                            recent_data['close'].iloc[i:i+5] > liquidity_zones['discount'])):
-                    
-                    if recent_data['volume'].iloc[i:i+5].mean() > 1.5 * avg_volume:
-                        events['runs'].append({
-                            'type': zone,
-                            'start_price': price,
-                            'end_price': recent_data['close'].iloc[i+4],
-                            'start_timestamp': recent_data.index[i],
-                            'end_timestamp': recent_data.index[i+4]
-                        })
-            
-            current_zone = zone
-        
+        premium = liquidity_zones['premium']
+        discount = liquidity_zones['discount']
+
+        start = lookback
+        end = len(recent_data) - 5
+        if end > start:
+            # Classify every bar's zone in one pass
+            zones = np.select(
+                [close >= premium, close <= discount],
+                ['premium', 'discount'],
+                default='equilibrium'
+            )
+
+            # Bars whose zone differs from the previous bar; the first
+            # scanned bar has no prior zone and always counts as a change
+            changed = np.empty(end - start, dtype=bool)
+            changed[0] = True
+            changed[1:] = zones[start + 1:end] != zones[start:end - 1]
+
+            # 5-bar windows over close and volume, built once as views
+            win_close = sliding_window_view(close, 5)
+            win_vol = sliding_window_view(volume, 5)
+
+            # Sustain and volume tests for every window as SIMD reductions
+            sustain_premium = (win_close > premium).all(axis=1)
+            sustain_discount = (win_close < discount).all(axis=1)
+            sustain_equilibrium = ((win_close < premium) & (win_close > discount)).all(axis=1)
+            volume_ok = win_vol.mean(axis=1) > 1.5 * avg_volume
+
+            # Pick each bar's sustain test by zone, then one boolean AND
+            # yields the event mask
+            zone_slice = zones[start:end]
+            sustained = np.where(
+                zone_slice == 'premium', sustain_premium[start:end],
+                np.where(zone_slice == 'discount', sustain_discount[start:end],
+                         sustain_equilibrium[start:end])
+            )
+            event_mask = changed & sustained & volume_ok[start:end]
+
+            for i in np.arange(start, end)[event_mask]:
+                events['runs'].append({
+                    'type': str(zones[i]),
+                    'start_price': close[i],
+                    'end_price': close[i + 4],
+                    'start_timestamp': recent_data.index[i],
+                    'end_timestamp': recent_data.index[i + 4]
+                })
+
         return events
 
     def generate_signals(self) -> Dict:
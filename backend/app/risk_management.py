@@ -1,8 +1,121 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple, Optional
 from entry_systems import EntrySystems
+from _numba import njit, NUMBA_AVAILABLE
+
+# ATR multiplier per timeframe: 1.5 for scalping, 2.0 for intraday/weekly.
+# A single hash lookup replaces the old list-membership scan per call.
+_TF_MULT = {
+    '1m': 1.5, '5m': 1.5, '15m': 1.5,
+    '30m': 2.0, '1h': 2.0, '4h': 2.0, '1d': 2.0
+}
+
+# Asset-specific pip values
+PIP_VALUES = {
+    'XAUUSD': 0.01,  # Gold moves in $0.01 increments
+    'NASDAQ': 1.0    # NASDAQ moves in 1.0 point increments
+}
+
+class Position(NamedTuple):
+    """Sized position; the tuple layout skips a dict allocation per call
+    and callers needing a dict can use ._asdict()"""
+    position_size: float
+    risk_amount: float
+    stop_loss_distance: float
+    pip_value: float
+
+@lru_cache(maxsize=1024)
+def _position(asset: str, entry_price: float, stop_loss: float,
+              balance: float, risk_percent: float,
+              direction: Optional[str]) -> Position:
+    # Ensure risk is within limits
+    risk_percent = min(risk_percent, 0.02)  # Max 2% risk per trade
+
+    # Stop distance in pips; when the direction is known the sign of
+    # entry - stop is too (stop below a long entry, above a short one),
+    # so the abs() call can be folded away
+    if direction == 'long':
+        stop_loss_distance = entry_price - stop_loss
+    elif direction == 'short':
+        stop_loss_distance = stop_loss - entry_price
+    else:
+        stop_loss_distance = abs(entry_price - stop_loss)
+    pip_value = PIP_VALUES[asset]
+
+    # Calculate position size
+    risk_amount = balance * risk_percent
+    position_size = risk_amount / (stop_loss_distance * pip_value)
+
+    return Position(position_size, risk_amount, stop_loss_distance, pip_value)
+
+def attach_ts64(signals: List[Dict]) -> List[Dict]:
+    """Pre-parse each signal's ISO timestamp into a numpy datetime64.
+
+    Doing the parse once at ingestion lets the daily risk check filter
+    with a vectorized day comparison instead of string work per call.
+    """
+    for signal in signals:
+        if 'ts64' not in signal:
+            signal['ts64'] = np.datetime64(signal['timestamp'][:19], 's')
+    return signals
+
+def _round_sig(value: float, digits: int = 6) -> float:
+    """Round to significant digits so float noise still hits the caches"""
+    return float(f'{value:.{digits}g}')
+
+@lru_cache(maxsize=4096)
+def _dynamic_stop(entry_price: float, direction: str, atr_multiplier: float, atr: float) -> float:
+    sign = 1.0 if direction == 'long' else -1.0
+    return entry_price - sign * atr * atr_multiplier
+
+@lru_cache(maxsize=4096)
+def _trailing_stop(entry_price: float, current_price: float, direction: str, atr: float) -> float:
+    sign = 1.0 if direction == 'long' else -1.0
+    profit = sign * (current_price - entry_price)
+
+    if profit >= atr:  # Move to breakeven after 1x ATR profit
+        candidate = current_price - sign * atr
+        # max(entry, candidate) for longs, min(entry, candidate) for shorts
+        return entry_price + sign * max(0.0, sign * (candidate - entry_price))
+    return entry_price - sign * 1.5 * atr  # Initial stop
+
+@njit(cache=True, fastmath=True)
+def _atr_last(high, low, close, period):
+    """Latest ATR in one fused pass with zero intermediate allocations"""
+    n = high.shape[0]
+    start = n - period
+    if start < 0:
+        start = 0
+
+    total = 0.0
+    for i in range(start, n):
+        prev_close = close[i - 1] if i > 0 else close[0]
+        tr = high[i] - low[i]
+        a = abs(high[i] - prev_close)
+        b = abs(low[i] - prev_close)
+        if a > tr:
+            tr = a
+        if b > tr:
+            tr = b
+        total += tr
+
+    return total / (n - start)
+
+@njit(cache=True)
+def _max_dd(equity):
+    """Single-pass max drawdown: two scalars, no intermediate arrays"""
+    peak = equity[0]
+    mdd = 0.0
+    for i in range(1, equity.shape[0]):
+        if equity[i] > peak:
+            peak = equity[i]
+        d = (peak - equity[i]) / peak
+        if d > mdd:
+            mdd = d
+    return mdd
 
 class RiskManagement:
     def __init__(self, data: pd.DataFrame, entry_systems: EntrySystems):
@@ -14,81 +127,120 @@ class RiskManagement:
         self.max_daily_risk = 0.05
         
         # Asset-specific pip values
-        self.pip_values = {
-            'XAUUSD': 0.01,  # Gold moves in $0.01 increments
-            'NASDAQ': 1.0    # NASDAQ moves in 1.0 point increments
-        }
-    
+        self.pip_values = PIP_VALUES
+
+        # Contiguous column arrays extracted once; the hot paths below
+        # never go back through the pandas indexer, and the numba kernel
+        # gets contiguous inputs directly. float32 is ample for indicator
+        # math at instrument tick resolution and halves the bytes the TR
+        # scan pulls through cache; monetary math (balance, risk_amount)
+        # stays float64
+        self._h = np.ascontiguousarray(data['high'].values, dtype=np.float32)
+        self._l = np.ascontiguousarray(data['low'].values, dtype=np.float32)
+        self._c = np.ascontiguousarray(data['close'].values, dtype=np.float32)
+        self._n = self._c.shape[0]
+
+        # ATR memo keyed on the data snapshot, so repeated calls for the
+        # same bar are O(1)
+        self._atr_cache: Dict[Tuple, float] = {}
+
+        # True-range ring buffer for live bars: update_bar maintains a
+        # running window sum so streaming ATR updates are O(1) instead of
+        # a full recompute per bar. Seeded here from the trailing window
+        self._tr_ring = np.zeros(self.atr_period, dtype=np.float64)
+        self._tr_sum = 0.0
+        self._tr_count = 0
+        self._ring_idx = 0
+        self._bars = self._n
+        self._prev_close = float(self._c[-1]) if self._n else 0.0
+        for j in range(max(0, self._n - self.atr_period), self._n):
+            prev_close = self._c[j - 1] if j > 0 else self._c[0]
+            self._push_tr(max(self._h[j] - self._l[j],
+                              abs(self._h[j] - prev_close),
+                              abs(self._l[j] - prev_close)))
+
+    def _push_tr(self, tr: float) -> None:
+        """Push one true-range value into the ring, evicting the oldest"""
+        idx = self._ring_idx
+        if self._tr_count == self.atr_period:
+            self._tr_sum += tr - self._tr_ring[idx]
+        else:
+            self._tr_sum += tr
+            self._tr_count += 1
+        self._tr_ring[idx] = tr
+        self._ring_idx = (idx + 1) % self.atr_period
+
+    def update_bar(self, high: float, low: float, close: float) -> None:
+        """Fold one live bar into the ATR state in constant time"""
+        self._push_tr(max(high - low,
+                          abs(high - self._prev_close),
+                          abs(low - self._prev_close)))
+        self._prev_close = close
+        self._bars += 1
+        self._atr_cache.clear()
+
     def calculate_atr(self) -> float:
         """Calculate Average True Range"""
-        high = self.data['high']
-        low = self.data['low']
-        close = self.data['close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=self.atr_period).mean()
-        
-        return atr.iloc[-1]
+        key = (self._bars, self.data.index[-1])
+        if key in self._atr_cache:
+            return self._atr_cache[key]
+
+        if self._bars > self._n:
+            # Live bars have been pushed; the ring's running sum is the
+            # authoritative trailing window
+            atr = self._tr_sum / self._tr_count
+            self._atr_cache[key] = atr
+            return atr
+
+        high, low, close = self._h, self._l, self._c
+
+        if NUMBA_AVAILABLE:
+            atr = float(_atr_last(high, low, close, self.atr_period))
+        else:
+            prev_close = np.empty_like(close)
+            prev_close[0] = close[0]
+            prev_close[1:] = close[:-1]
+
+            # True Range on raw arrays; only the trailing window is
+            # averaged, so no DataFrame or full rolling pass is needed.
+            # Pairwise in-place maximums skip the temporary list that
+            # maximum.reduce would build
+            tr = high - low
+            np.maximum(tr, np.abs(high - prev_close), out=tr)
+            np.maximum(tr, np.abs(low - prev_close), out=tr)
+            atr = float(tr[-self.atr_period:].mean())
 
-    def calculate_position_size(self, asset: str, entry_price: float, stop_loss: float, 
-                              balance: float = None, risk_percent: float = None) -> Dict:
+        self._atr_cache[key] = atr
+        return atr
+
+    def calculate_position_size(self, asset: str, entry_price: float, stop_loss: float,
+                              balance: float = None, risk_percent: float = None,
+                              direction: Optional[str] = None) -> Position:
         """Calculate position size based on risk parameters"""
         if balance is None:
             balance = self.default_balance
         if risk_percent is None:
             risk_percent = self.default_risk_percent
-            
-        # Ensure risk is within limits
-        risk_percent = min(risk_percent, 0.02)  # Max 2% risk per trade
-        
-        # Calculate stop loss distance in pips
-        stop_loss_distance = abs(entry_price - stop_loss)
-        pip_value = self.pip_values[asset]
-        
-        # Calculate position size
-        risk_amount = balance * risk_percent
-        position_size = risk_amount / (stop_loss_distance * pip_value)
-        
-        return {
-            'position_size': position_size,
-            'risk_amount': risk_amount,
-            'stop_loss_distance': stop_loss_distance,
-            'pip_value': pip_value
-        }
 
-    def calculate_dynamic_stop_loss(self, entry_price: float, direction: str, 
-                                  timeframe: str) -> float:
+        # Rounded scalar key so repeated sizing of the same trade is a
+        # cache hit
+        return _position(asset, round(entry_price, 6), round(stop_loss, 6),
+                         round(balance, 2), round(risk_percent, 4), direction)
+
+    def calculate_dynamic_stop_loss(self, entry_price: float, direction: str,
+                                  timeframe: str, atr: Optional[float] = None) -> float:
         """Calculate dynamic stop loss based on timeframe and ATR"""
-        atr = self.calculate_atr()
-        
-        # Adjust ATR multiplier based on timeframe
-        if timeframe in ['1m', '5m', '15m']:
-            atr_multiplier = 1.5  # Scalping
-        else:
-            atr_multiplier = 2.0  # Intraday/Weekly
-        
-        if direction == 'long':
-            return entry_price - (atr * atr_multiplier)
-        else:
-            return entry_price + (atr * atr_multiplier)
+        if atr is None:
+            atr = self.calculate_atr()
+
+        # Pure scalar math, so identical polled inputs hit the LRU cache
+        return _dynamic_stop(entry_price, direction,
+                             _TF_MULT.get(timeframe, 2.0), _round_sig(atr))
 
-    def calculate_trailing_stop(self, entry_price: float, current_price: float, 
+    def calculate_trailing_stop(self, entry_price: float, current_price: float,
                               direction: str, atr: float) -> float:
         """Calculate trailing stop based on price movement"""
-        if direction == 'long':
-            profit = current_price - entry_price
-            if profit >= atr:  # Move to breakeven after 1x ATR profit
-                return max(entry_price, current_price - atr)
-            return entry_price - (1.5 * atr)  # Initial stop
-        else:
-            profit = entry_price - current_price
-            if profit >= atr:  # Move to breakeven after 1x ATR profit
-                return min(entry_price, current_price + atr)
-            return entry_price + (1.5 * atr)  # Initial stop
+        return _trailing_stop(entry_price, current_price, direction, _round_sig(atr))
 
     def calculate_portfolio_metrics(self, signals: List[Dict]) -> Dict:
         """Calculate portfolio metrics from trade signals"""
@@ -100,38 +252,40 @@ class RiskManagement:
                 'total_trades': 0
             }
         
-        # Calculate win rate
-        winning_trades = sum(1 for signal in signals if signal.get('result') == 'win')
-        total_trades = len(signals)
-        win_rate = winning_trades / total_trades if total_trades > 0 else 0
-        
-        # Calculate risk-reward ratios
+        # Win rate and risk-reward ratios in one fused pass over the
+        # signal list instead of a scan per metric
+        winning_trades = 0
         risk_rewards = []
         for signal in signals:
+            if signal.get('result') == 'win':
+                winning_trades += 1
             if 'take_profit' in signal and 'stop_loss' in signal:
                 risk = abs(signal['entry_price'] - signal['stop_loss'])
-                reward = abs(signal['take_profit'] - signal['entry_price'])
                 if risk > 0:
-                    risk_rewards.append(reward / risk)
-        
-        avg_risk_reward = np.mean(risk_rewards) if risk_rewards else 0
-        
-        # Calculate drawdown
-        equity_curve = []
-        current_equity = self.default_balance
-        
-        for signal in signals:
-            if 'result' in signal and 'risk_amount' in signal:
-                if signal['result'] == 'win':
-                    current_equity += signal['risk_amount'] * signal.get('risk_reward', 1)
-                else:
-                    current_equity -= signal['risk_amount']
-                equity_curve.append(current_equity)
+                    risk_rewards.append(abs(signal['take_profit'] - signal['entry_price']) / risk)
+
+        total_trades = len(signals)
+        win_rate = winning_trades / total_trades if total_trades > 0 else 0
+        # Plain sum/len: the list is small and np.mean would pay an
+        # array conversion bigger than the mean itself
+        avg_risk_reward = sum(risk_rewards) / len(risk_rewards) if risk_rewards else 0
         
-        if equity_curve:
-            peak = np.maximum.accumulate(equity_curve)
-            drawdown = (peak - equity_curve) / peak
-            max_drawdown = np.max(drawdown)
+        # Calculate drawdown from a vectorized P&L pass
+        tracked = [s for s in signals if 'result' in s and 'risk_amount' in s]
+        if tracked:
+            count = len(tracked)
+            result = np.fromiter((s['result'] for s in tracked), dtype='U8', count=count)
+            risk_amount = np.fromiter((s['risk_amount'] for s in tracked), dtype=np.float64, count=count)
+            risk_reward = np.fromiter((s.get('risk_reward', 1) for s in tracked), dtype=np.float64, count=count)
+
+            pnl = np.where(result == 'win', risk_amount * risk_reward, -risk_amount)
+            equity_curve = self.default_balance + np.cumsum(pnl)
+            if NUMBA_AVAILABLE:
+                # Fused kernel: one pass, no peak/drawdown temporaries
+                max_drawdown = float(_max_dd(equity_curve))
+            else:
+                peak = np.maximum.accumulate(equity_curve)
+                max_drawdown = float(((peak - equity_curve) / peak).max())
         else:
             max_drawdown = 0
         
@@ -142,75 +296,158 @@ class RiskManagement:
             'total_trades': total_trades
         }
 
-    def generate_risk_metrics(self, asset: str, timeframe: str, 
-                            balance: float = None) -> Dict:
-        """Generate comprehensive risk metrics for a trade"""
-        # Get latest entry signal
-        entries = self.entry_systems.generate_entries()
-        if not entries:
-            return {'error': 'No entry signals available'}
-        
-        # Get the first available entry signal
-        entry = next(iter(entries.values()))
+    def generate_risk_metrics(self, asset: str, timeframe: str,
+                            balance: float = None,
+                            entry: Optional[Dict] = None) -> Dict:
+        """Generate comprehensive risk metrics for a trade.
+
+        Callers that already hold an entry signal can pass it in to skip
+        re-running the entry systems.
+        """
+        if entry is None:
+            # Get the latest entry signal; latest_entry short-circuits
+            # after the first system that triggers
+            entry = self.entry_systems.latest_entry()
+            if entry is None:
+                return {'error': 'No entry signals available'}
         
         # Calculate position size
         position = self.calculate_position_size(
             asset=asset,
             entry_price=entry['entry_price'],
             stop_loss=entry['stop_loss'],
-            balance=balance
+            balance=balance,
+            direction=entry['direction']
         )
         
+        # Calculate ATR once and thread it through the stop calculations
+        atr = self.calculate_atr()
+
         # Calculate dynamic stop loss
         dynamic_stop = self.calculate_dynamic_stop_loss(
             entry_price=entry['entry_price'],
             direction=entry['direction'],
-            timeframe=timeframe
+            timeframe=timeframe,
+            atr=atr
         )
         
         # Calculate trailing stop
-        atr = self.calculate_atr()
         trailing_stop = self.calculate_trailing_stop(
             entry_price=entry['entry_price'],
-            current_price=self.data['close'].iloc[-1],
+            current_price=self._c[-1],
             direction=entry['direction'],
             atr=atr
         )
         
-        # Calculate risk-reward ratio
-        risk = abs(entry['entry_price'] - entry['stop_loss'])
-        reward = abs(entry['take_profit'] - entry['entry_price'])
+        # Calculate risk-reward ratio; the direction sign replaces the
+        # abs() calls
+        sign = 1.0 if entry['direction'] == 'long' else -1.0
+        risk = sign * (entry['entry_price'] - entry['stop_loss'])
+        reward = sign * (entry['take_profit'] - entry['entry_price'])
         risk_reward = reward / risk if risk > 0 else 0
         
         return {
-            'position_size': position['position_size'],
-            'risk_amount': position['risk_amount'],
+            'position_size': position.position_size,
+            'risk_amount': position.risk_amount,
             'dynamic_stop_loss': dynamic_stop,
             'trailing_stop': trailing_stop,
             'risk_reward_ratio': risk_reward,
             'atr': atr,
-            'pip_value': position['pip_value']
+            'pip_value': position.pip_value
         }
 
-    def check_daily_risk_limit(self, signals: List[Dict], 
+    def generate_risk_metrics_batch(self, entries: List[Dict], asset: str,
+                                  timeframe: str, balance: float = None) -> List[Dict]:
+        """Generate risk metrics for many entries in one vectorized pass.
+
+        ATR is computed once and amortized over every entry; the stop,
+        trailing-stop and risk-reward math runs as ndarray arithmetic
+        instead of per-entry Python calls.
+        """
+        if not entries:
+            return []
+        if balance is None:
+            balance = self.default_balance
+
+        atr = self.calculate_atr()
+        count = len(entries)
+
+        entry_price = np.fromiter((e['entry_price'] for e in entries), dtype=np.float64, count=count)
+        stop_loss = np.fromiter((e['stop_loss'] for e in entries), dtype=np.float64, count=count)
+        take_profit = np.fromiter((e['take_profit'] for e in entries), dtype=np.float64, count=count)
+        sign = np.fromiter((1.0 if e['direction'] == 'long' else -1.0 for e in entries),
+                           dtype=np.float64, count=count)
+
+        # Dynamic stops: entry minus a signed ATR multiple per timeframe
+        multiplier = _TF_MULT.get(timeframe, 2.0)
+        dynamic_stop = entry_price - sign * atr * multiplier
+
+        # Trailing stops, branchless over the whole batch (same folding as
+        # _trailing_stop): breakeven-or-better once 1x ATR in profit,
+        # otherwise the initial 1.5x ATR stop
+        current_price = self._c[-1]
+        profit = sign * (current_price - entry_price)
+        candidate = current_price - sign * atr
+        locked = entry_price + sign * np.maximum(0.0, sign * (candidate - entry_price))
+        trailing_stop = np.where(profit >= atr, locked, entry_price - sign * 1.5 * atr)
+
+        # Position sizing: pip value is per-asset, so the whole batch
+        # shares one scalar. The direction sign folds both abs() calls
+        # into multiplications
+        risk = sign * (entry_price - stop_loss)
+        reward = sign * (take_profit - entry_price)
+        nonzero = risk > 0
+        risk_reward = np.divide(reward, risk, out=np.zeros(count), where=nonzero)
+        pip_value = self.pip_values[asset]
+        risk_amount = balance * self.default_risk_percent
+        position_size = np.divide(risk_amount, risk * pip_value,
+                                  out=np.zeros(count), where=nonzero)
+
+        return [
+            {
+                'position_size': position_size[i],
+                'risk_amount': risk_amount,
+                'dynamic_stop_loss': dynamic_stop[i],
+                'trailing_stop': trailing_stop[i],
+                'risk_reward_ratio': risk_reward[i],
+                'atr': atr,
+                'pip_value': pip_value
+            }
+            for i in range(count)
+        ]
+
+    def check_daily_risk_limit(self, signals: List[Dict],
                              balance: float = None) -> Dict:
         """Check if daily risk limit is exceeded"""
         if balance is None:
             balance = self.default_balance
         
-        # Get today's signals
         today = datetime.now().date()
-        today_signals = [
-            signal for signal in signals 
-            if datetime.fromisoformat(signal['timestamp']).date() == today
-        ]
-        
-        # Calculate total risk for today
-        total_risk = sum(
-            signal.get('risk_amount', 0) 
-            for signal in today_signals
-        )
-        
+        if signals and all('ts64' in signal for signal in signals):
+            # Pre-parsed timestamps (see attach_ts64): one vectorized
+            # day comparison picks out today's signals
+            count = len(signals)
+            ts = np.fromiter((signal['ts64'] for signal in signals),
+                             dtype='datetime64[s]', count=count)
+            risk_amounts = np.fromiter((signal.get('risk_amount', 0) for signal in signals),
+                                       dtype=np.float64, count=count)
+            mask = ts.astype('datetime64[D]') == np.datetime64(today)
+            total_risk = float(risk_amounts[mask].sum())
+            today_count = int(mask.sum())
+        else:
+            # ISO-8601 timestamps start with YYYY-MM-DD, so a date-prefix
+            # comparison avoids parsing every signal
+            today_iso = today.isoformat()
+            today_signals = [
+                signal for signal in signals
+                if signal['timestamp'][:10] == today_iso
+            ]
+            total_risk = sum(
+                signal.get('risk_amount', 0)
+                for signal in today_signals
+            )
+            today_count = len(today_signals)
+
         daily_risk_percent = total_risk / balance
         risk_limit_exceeded = daily_risk_percent > self.max_daily_risk
         
@@ -218,5 +455,5 @@ class RiskManagement:
             'daily_risk_percent': daily_risk_percent,
             'risk_limit_exceeded': risk_limit_exceeded,
             'remaining_risk': max(0, (self.max_daily_risk * balance) - total_risk),
-            'today_signals': len(today_signals)
-        } 
\ No newline at end of file
+            'today_signals': today_count
+        }
\ No newline at end of file
@@ -0,0 +1,19 @@
+"""WSGI entry point for running the API under gunicorn.
+
+The werkzeug dev server handles one request at a time, and each request
+can block for seconds on Supabase and Alpha Vantage I/O. Threaded
+gunicorn workers overlap that I/O:
+
+    gunicorn -k gthread -w 4 --threads 8 -b 0.0.0.0:8000 wsgi:app
+"""
+import os
+import sys
+
+# The app modules import each other flatly (as under `flask run`), so the
+# app directory itself has to be on the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+
+from app import app
+
+if __name__ == '__main__':
+    app.run()